@@ -27,8 +27,10 @@ def sample_rate(ds: AbstractTimeSeriesDataset, unit: str = "s") -> np.ndarray:
         diff = np.diff(life.index.values)
         if pd.api.types.is_timedelta64_ns_dtype(diff.dtype):
             diff = diff / np.timedelta64(1, unit)
-        time_diff.extend(diff)
-    return np.array(time_diff)
+        time_diff.append(diff)
+    if len(time_diff) == 0:
+        return np.array([])
+    return np.concatenate(time_diff)
 
 
 def sample_rate_summary(
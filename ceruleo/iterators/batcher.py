@@ -7,6 +7,9 @@ In particular, this module was created to be used with pytorch models.
 Take a look at the pytorch example to see its usage.
 """
 import math
+import queue
+import threading
+import weakref
 from typing import Tuple
 
 import numpy as np
@@ -21,13 +24,63 @@ from ceruleo.iterators.iterators import (
 from ceruleo.iterators.shufflers import AbstractShuffler, NotShuffled
 
 
+def _put(
+    batcher_ref: weakref.ref, q: queue.Queue, stop_producer: threading.Event, item
+) -> bool:
+    while not stop_producer.is_set() and batcher_ref() is not None:
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _produce(
+    batcher_ref: weakref.ref, q: queue.Queue, stop_producer: threading.Event
+):
+    # Only a weak reference to the batcher is kept while waiting on the queue,
+    # so an abandoned batcher can be collected and its __del__ stops the thread.
+    # The consumer can hold one batch while the queue is full and the
+    # producer fills another one, so prefetch + 2 buffers never overlap
+    buffers = None
+    k = 0
+    while True:
+        batcher = batcher_ref()
+        if batcher is None:
+            return
+        if batcher.stop:
+            break
+        if buffers is None:
+            buffers = [None] * (batcher.prefetch + 2)
+        batcher.batch_data = buffers[k]
+        try:
+            batch = batcher._next_batch()
+        except Exception as e:
+            del batcher
+            _put(batcher_ref, q, stop_producer, e)
+            return
+        buffers[k] = batcher.batch_data
+        k = (k + 1) % len(buffers)
+        del batcher
+        if not _put(batcher_ref, q, stop_producer, batch):
+            return
+    del batcher
+    _put(batcher_ref, q, stop_producer, None)
+
+
 class Batcher:
     """
     WindowedIterator Batcher   
 
+    The samples are written directly into preallocated float32 buffers,
+    so each batch is returned as float32 arrays.
+
     Parameters:
         iterator: Dataset iterator
         batch_size: int
+        prefetch: Number of batches to be computed in advance in a background thread.
+                  If 0, the batches are computed when requested
 
     """
 
@@ -35,11 +88,16 @@ class Batcher:
         self,
         iterator: WindowedDatasetIterator,
         batch_size: int,
+        prefetch: int = 0,
     ):
         self.iterator = iterator
         self.batch_size = batch_size
+        self.prefetch = prefetch
         self.stop = False
         self.batch_data = None
+        self._queue = None
+        self._producer = None
+        self._stop_producer = None
 
     @staticmethod
     def new(
@@ -52,6 +110,7 @@ class Batcher:
         sample_weight: SampleWeight = NotWeighted(),
         right_closed: bool = True,
         padding: bool = False,
+        prefetch: int = 0,
     ) -> "Batcher":
         """
         Batcher constructor from a dataset
@@ -83,6 +142,7 @@ class Batcher:
             sample_weight: SampleWeight
             right_closed: bool
             padding: wheter to pad data if there are not enough points to fill the window
+            prefetch: Number of batches to be computed in advance in a background thread
 
         Returns:
             A new constructed batcher
@@ -97,7 +157,7 @@ class Batcher:
             right_closed=right_closed,
             padding=padding,
         )
-        b = Batcher(iterator, batch_size)
+        b = Batcher(iterator, batch_size, prefetch=prefetch)
         return b
 
     def __len__(self) -> int:
@@ -113,6 +173,7 @@ class Batcher:
         return q
 
     def __iter__(self):
+        self._stop_prefetching()
         self.stop = False
         self.iterator.__iter__()
         return self
@@ -193,7 +254,7 @@ class Batcher:
                     shape = d.shape
                 elif isinstance(d, list):
                     shape = (len(d),)
-                return np.zeros((self.batch_size, *shape))
+                return np.empty((self.batch_size, *shape), dtype=np.float32)
 
         if self.batch_data is not None:
             return
@@ -225,9 +286,7 @@ class Batcher:
             )
         return sliced_data
 
-    def __next__(self):
-        if self.stop:
-            raise StopIteration
+    def _next_batch(self):
         try:
             actual_batch_size = 0
             for j in range(self.batch_size):
@@ -239,3 +298,58 @@ class Batcher:
             self.stop = True
 
         return self._slice_data(actual_batch_size)
+
+    def _start_prefetching(self):
+        self._queue = queue.Queue(maxsize=self.prefetch)
+        self._stop_producer = threading.Event()
+        self._producer = threading.Thread(
+            target=_produce,
+            args=(weakref.ref(self), self._queue, self._stop_producer),
+            daemon=True,
+        )
+        self._producer.start()
+
+    def _stop_prefetching(self):
+        if getattr(self, "_producer", None) is None:
+            return
+        self._stop_producer.set()
+        if self._producer is not threading.current_thread():
+            self._producer.join()
+        self._queue = None
+        self._producer = None
+        self._stop_producer = None
+        self.batch_data = None
+
+    def close(self):
+        """
+        Stop the background thread that prefetches the batches
+
+        It is only needed when the iteration is abandoned before the 
+        batches are exhausted. It is also called when the batcher is garbage collected
+        """
+        self._stop_prefetching()
+
+    def __del__(self):
+        self.close()
+
+    def _next_prefetched(self):
+        if self._producer is None:
+            if self.stop:
+                raise StopIteration
+            self._start_prefetching()
+        item = self._queue.get()
+        if item is None:
+            self._stop_prefetching()
+            self.stop = True
+            raise StopIteration
+        if isinstance(item, Exception):
+            self._stop_prefetching()
+            raise item
+        return item
+
+    def __next__(self):
+        if self.prefetch > 0:
+            return self._next_prefetched()
+        if self.stop:
+            raise StopIteration
+        return self._next_batch()
@@ -294,9 +294,11 @@ def predict_batch(model, dataset_batcher: Batcher) -> np.ndarray:
     """
     y_pred = []
     for X, y in dataset_batcher:
-        y_pred.extend(
-            np.squeeze(
-                model.predict(np.reshape(X, (X.shape[0], X.shape[1] * X.shape[2])))
+        y_pred.append(
+            np.atleast_1d(
+                np.squeeze(
+                    model.predict(np.reshape(X, (X.shape[0], X.shape[1] * X.shape[2])))
+                )
             )
         )
-    return np.squeeze(np.array(y_pred))
+    return np.squeeze(np.concatenate(y_pred))
@@ -1,3 +1,4 @@
+from math import sqrt
 from typing import List, Tuple
 
 import numpy as np
@@ -12,6 +13,9 @@ class Segment:
         self.yy = 0
         self.B = 0
         self.segment_error = []
+        # Running mean and sum of squared deviations of segment_error (Welford)
+        self._error_mean = 0.0
+        self._error_m2 = 0.0
         self.std_deviation = 2
         self.not_increasing = not_increasing
 
@@ -38,8 +42,8 @@ class Segment:
         SSR = (yy - B * xy) * self.n
         new_segment = False
         if self.n > 15:
-            mean_error = np.mean(self.segment_error)
-            std_error = np.std(self.segment_error)
+            mean_error = self._error_mean
+            std_error = sqrt(self._error_m2 / len(self.segment_error))
             new_segment = SSR > mean_error + 1.5 *std_error
         else:
             new_segment = False
@@ -59,6 +63,9 @@ class Segment:
             self.B = 0
         SSR = (self.yy - self.B * self.xy) * self.n
         self.segment_error.append(SSR)
+        delta = SSR - self._error_mean
+        self._error_mean += delta / len(self.segment_error)
+        self._error_m2 += delta * (SSR - self._error_mean)
         self.compute_endpoint(current_t)
 
 
@@ -150,6 +157,28 @@ class PiecewiseLinearRegression:
             self.segments.append(Segment(self.segments[-1].final, not_increasing=self.not_increasing))
             self.segments[-1].add(t, s)
 
+    def fit(self, t: np.ndarray, s: np.ndarray) -> "PiecewiseLinearRegression":
+        """Add all the points of a signal to the regression
+
+        Parameters
+        ----------
+        t : np.ndarray
+            x components
+        s : np.ndarray
+            y components
+
+        Returns
+        -------
+        PiecewiseLinearRegression
+            The regression itself
+        """
+        add_point = self.add_point
+        t = np.asarray(t, dtype=np.float64).tolist()
+        s = np.asarray(s, dtype=np.float64).tolist()
+        for t_i, s_i in zip(t, s):
+            add_point(t_i, s_i)
+        return self
+
     def finish(self) -> PiecewesieLinearFunction:
         """Complete last unfinished segment and return the model computed
 
@@ -29,6 +29,7 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
+from numba import njit
 from ceruleo.results.picewise_regression import (
     PiecewesieLinearFunction,
     PiecewiseLinearRegression,
@@ -77,25 +78,45 @@ class PredictionResult:
 
 
 def compute_sample_weight(sample_weight, y_true, y_pred, c: float = 0.9):
+    """
+    Compute the weight of each sample used in the error metrics
+
+    Parameters:
+        sample_weight: Type of weighting. If "relative", each sample is weighted by
+                       its absolute error relative to the true value, lower bounded by c
+        y_true: True RUL values
+        y_pred: Predicted RUL values
+        c: Lower bound of the true values used in the relative weighting
+
+    Returns:
+        An array with the weights, or the scalar 1.0 that broadcasts to every sample
+    """
     if sample_weight == "relative":
-        sample_weight = np.abs(y_true - y_pred) / (np.clip(y_true, c, np.inf))
-    else:
-        sample_weight = 1
-    return sample_weight
+        return np.abs(y_true - y_pred) / np.maximum(y_true, c)
+    return np.float64(1.0)
 
 
-def compute_rul_line(rul: float, n: int, tt: Optional[np.array] = None):
-    if tt is None:
-        tt = -np.ones(n)
+@njit(cache=True)
+def _compute_rul_line_nb(rul: float, tt: np.ndarray, n: int) -> np.ndarray:
     z = np.zeros(n)
     z[0] = rul
-    for i in range(len(tt) - 1):
-        z[i + 1] = max(z[i] + tt[i], 0)
-        if z[i + 1] - 0 < 0.0000000000001:
+    for i in range(min(len(tt), n) - 1):
+        v = z[i] + tt[i]
+        z[i + 1] = 0.0 if v < 0 else v
+        if z[i + 1] < 0.0000000000001:
             break
     return z
 
 
+def compute_rul_line(rul: float, n: int, tt: Optional[np.array] = None):
+    if tt is None:
+        # With unit decrements the recurrence has the closed form max(rul - i, 0)
+        z = np.maximum(rul - np.arange(n, dtype=np.float64), 0)
+        z[0] = rul
+        return z
+    return _compute_rul_line_nb(float(rul), np.asarray(tt, dtype=np.float64), n)
+
+
 class CVResults:
     """
     Compute the error histogram
@@ -128,26 +149,36 @@ class CVResults:
         self.mse = np.zeros((self.n_folds, self.n_bins))
         self.errors = []
         for i, (y_pred, y_true) in enumerate(zip(y_pred, y_true)):
-            self._add_fold_result(i, y_pred, y_true)
+            self._add_fold_result(i, np.squeeze(y_pred), np.squeeze(y_true))
 
     def _add_fold_result(self, fold: int, y_pred: np.array, y_true: np.array):
-        y_pred = np.squeeze(y_pred)
-        y_true = np.squeeze(y_true)
-
-        for j in range(len(self.bin_edges) - 1):
-            mask = (y_true >= self.bin_edges[j]) & (y_true <= self.bin_edges[j + 1])
-            indices = np.where(mask)[0]
-
-            if len(indices) == 0:
-                continue
-
-            errors = y_true[indices] - y_pred[indices]
-
-            self.mean_error[fold, j] = np.mean(errors)
-
-            self.mae[fold, j] = np.mean(np.abs(errors))
-            self.mse[fold, j] = np.mean((errors) ** 2)
-            self.errors.append(errors)
+        assert y_pred.ndim == 1 and y_true.ndim == 1
+
+        # Bin j contains the values in [bin_edges[j], bin_edges[j + 1]], so the values
+        # lying on an inner edge belong to the two bins that share it
+        bin_idx = np.searchsorted(self.bin_edges, y_true, side="right") - 1
+        bin_idx[y_true == self.bin_edges[-1]] = self.n_bins - 1
+        valid = (bin_idx >= 0) & (bin_idx < self.n_bins)
+        on_edge = np.flatnonzero(valid & np.isin(y_true, self.bin_edges[1:-1]))
+        positions = np.concatenate((np.flatnonzero(valid), on_edge))
+        bins = np.concatenate((bin_idx[valid], bin_idx[on_edge] - 1))
+
+        errors = y_true[positions] - y_pred[positions]
+        counts = np.bincount(bins, minlength=self.n_bins)
+        sum_errors = np.bincount(bins, weights=errors, minlength=self.n_bins)
+        sum_abs_errors = np.bincount(bins, weights=np.abs(errors), minlength=self.n_bins)
+        sum_sq_errors = np.bincount(bins, weights=errors * errors, minlength=self.n_bins)
+
+        not_empty = counts > 0
+        self.mean_error[fold, not_empty] = sum_errors[not_empty] / counts[not_empty]
+        self.mae[fold, not_empty] = sum_abs_errors[not_empty] / counts[not_empty]
+        self.mse[fold, not_empty] = sum_sq_errors[not_empty] / counts[not_empty]
+
+        order = np.lexsort((positions, bins))
+        errors_per_bin = np.split(errors[order], np.cumsum(counts)[:-1])
+        self.errors.extend(
+            errors_per_bin[j] for j in range(self.n_bins) if not_empty[j]
+        )
 
 
 def model_cv_results(
@@ -160,7 +191,7 @@ def model_cv_results(
     if nbins is None:
         nbins = len(bin_edges) - 1
     if bin_edges is None:
-        max_y_value = np.max([r.true_RUL.max() for r in results])
+        max_y_value = max(r.true_RUL.max() for r in results)
         bin_edges = np.linspace(0, max_y_value, nbins + 1)
 
     trues = []
@@ -175,12 +206,10 @@ def models_cv_results(
     results_dict: Dict[str, List[PredictionResult]], nbins: int
 ) -> Tuple[np.ndarray, Dict[str, CVResults]]:
     """Create a dictionary with the result of each cross validation of the model"""
-    max_y_value = np.max(
-        [
-            r.true_RUL.max()
-            for model_name in results_dict.keys()
-            for r in results_dict[model_name]
-        ]
+    max_y_value = max(
+        r.true_RUL.max()
+        for model_results in results_dict.values()
+        for r in model_results
     )
     bin_edges = np.linspace(0, max_y_value, nbins + 1)
     model_results = {}
@@ -224,9 +253,8 @@ class FittedLife:
                 self.time = np.array(np.linspace(0, y_true[0], n=len(y_true)))
 
         else:
-            self.degrading_start, self.time = FittedLife.compute_time_feature(
-                y_true, RUL_threshold
-            )
+            self.degrading_start = FittedLife._degrading_start(y_true, RUL_threshold)
+            self.time = FittedLife._compute_time(y_true, self.degrading_start)
 
         # self.y_pred_fitted_picewise = self._fit_picewise_linear_regression(y_pred)
         # self.y_true_fitted_picewise = self._fit_picewise_linear_regression(y_true)
@@ -234,6 +262,8 @@ class FittedLife:
         self.RUL_threshold = RUL_threshold
         self.y_pred = y_pred
         self.y_true = y_true
+        self._predicted_end_of_life = None
+        self._end_of_life = None
 
         self.y_pred_fitted_coefficients = np.polyfit(self.time, self.y_pred, 1)
         p = np.poly1d(self.y_pred_fitted_coefficients)
@@ -256,6 +286,7 @@ class FittedLife:
         Returns:
             Degrading start time and time
         """
+        y_true = np.squeeze(np.asarray(y_true))
         degrading_start = FittedLife._degrading_start(y_true, RUL_threshold)
         time = FittedLife._compute_time(y_true, degrading_start)
         return degrading_start, time
@@ -304,10 +335,11 @@ class FittedLife:
         Returns:
             Time component
         """
+        assert y_true.ndim == 1
         if len(y_true) == 1:
             return np.array([0])
 
-        time_diff = np.diff(np.squeeze(y_true)[degrading_start:][::-1])
+        time_diff = np.diff(y_true[degrading_start:][::-1])
         time = np.zeros(len(y_true))
         if degrading_start > 0:
             if len(time_diff) > 0:
@@ -328,9 +360,7 @@ class FittedLife:
             The Picewise linear function fitted
         """
         pwlr = PiecewiseLinearRegression(not_increasing=self.fit_line_not_increasing)
-        for j in range(len(y)):
-            pwlr.add_point(self.time[j], y[j])
-        line = pwlr.finish()
+        line = pwlr.fit(self.time[: len(y)], y).finish()
 
         return line
 
@@ -365,18 +395,26 @@ class FittedLife:
         return 1 - np.abs((d / (np.pi / 2)))
 
     def predicted_end_of_life(self):
-        z = np.where(self.y_pred == 0)[0]
-        if len(z) == 0:
-            return self.time[len(self.y_pred) - 1] + self.y_pred[-1]
-        else:
-            return self.time[z[0]]
+        # y_pred and time do not change after the construction, so the
+        # value is computed on the first call and reused afterwards
+        if self._predicted_end_of_life is None:
+            z = np.where(self.y_pred == 0)[0]
+            if len(z) == 0:
+                self._predicted_end_of_life = (
+                    self.time[len(self.y_pred) - 1] + self.y_pred[-1]
+                )
+            else:
+                self._predicted_end_of_life = self.time[z[0]]
+        return self._predicted_end_of_life
 
     def end_of_life(self):
-        z = np.where(self.y_true == 0)[0]
-        if len(z) == 0:
-            return self.time[len(self.y_pred) - 1] + self.y_true[-1]
-        else:
-            return self.time[z[0]]
+        if self._end_of_life is None:
+            z = np.where(self.y_true == 0)[0]
+            if len(z) == 0:
+                self._end_of_life = self.time[len(self.y_pred) - 1] + self.y_true[-1]
+            else:
+                self._end_of_life = self.time[z[0]]
+        return self._end_of_life
 
     def maintenance_point(self, m: float = 0) -> float:
         """
@@ -406,8 +444,10 @@ class FittedLife:
             Unexploited lifetime
         """
 
-        if self.maintenance_point(m) < self.end_of_life():
-            return self.end_of_life() - self.maintenance_point(m)
+        maintenance_point = self.maintenance_point(m)
+        end_of_life = self.end_of_life()
+        if maintenance_point < end_of_life:
+            return end_of_life - maintenance_point
         else:
             return 0
 
@@ -430,29 +470,28 @@ class FittedLife:
             return True
 
 
-def split_lives_indices(y_true: np.array) -> List[List[int]]:
+def split_lives_indices(y_true: np.array) -> List[slice]:
     """
-    Obtain a list of indices for each life
+    Obtain a slice for each life
 
     Parameters:
         y_true: True vector with the RUL
 
     Returns:
-        A list with the indices belonging to each life
+        A list with the slice of the elements belonging to each life
     """
     assert len(y_true) >= 2
-    lives_indices = (
-        [0]
-        + (np.where(np.diff(np.squeeze(y_true)) > 0)[0] + 1).tolist()
-        + [len(y_true)]
+    y_true = np.squeeze(y_true)
+    lives_indices = np.concatenate(
+        ([0], np.flatnonzero(np.diff(y_true) > 0) + 1, [len(y_true)])
     )
-    indices = []
-    for i in range(len(lives_indices) - 1):
-        r = range(lives_indices[i], lives_indices[i + 1])
-        if len(r) <= 1:
-            continue
-        indices.append(r)
-    return indices
+    starts = lives_indices[:-1]
+    ends = lives_indices[1:]
+    valid = (ends - starts) > 1
+    return [
+        slice(start, end)
+        for start, end in zip(starts[valid].tolist(), ends[valid].tolist())
+    ]
 
 
 def split_lives(
@@ -474,13 +513,14 @@ def split_lives(
        FittedLife list
     """
     lives = []
-    for r in split_lives_indices(results.true_RUL):
-        if np.any(np.isnan(results.predicted_RUL[r])):
+    for life_slice in split_lives_indices(results.true_RUL):
+        y_pred = results.predicted_RUL[life_slice]
+        if np.any(np.isnan(y_pred)):
             continue
         lives.append(
             FittedLife(
-                results.true_RUL[r],
-                results.predicted_RUL[r],
+                results.true_RUL[life_slice],
+                y_pred,
                 RUL_threshold=RUL_threshold,
                 fit_line_not_increasing=fit_line_not_increasing,
                 time=time,
@@ -489,27 +529,117 @@ def split_lives(
     return lives
 
 
-def unexploited_lifetime(d: PredictionResult, window_size: int, step: int):
-    bb = [split_lives(cv) for cv in d]
+# Fitted lives of the last list of cross validation results used. Only one
+# list is kept, along with a snapshot of its folds and their arrays, so
+# appending, removing or replacing a fold is detected
+_FoldKey = Tuple[PredictionResult, np.ndarray, np.ndarray]
+_lives_cache: Optional[Tuple[Tuple[_FoldKey, ...], List[List[FittedLife]]]] = None
+
+
+def _fold_key(cv: PredictionResult) -> _FoldKey:
+    return (cv, cv.true_RUL, cv.predicted_RUL)
+
+
+def _same_fold(a: _FoldKey, b: _FoldKey) -> bool:
+    return all(x is y for x, y in zip(a, b))
+
+
+def _lives_for(d: List[PredictionResult]) -> List[List[FittedLife]]:
+    """
+    Obtain the fitted lives of each fold, reusing the ones computed for the
+    folds of the previous call
+
+    Parameters:
+        d: List of the results of each fold
+
+    Returns:
+        A list with the FittedLife list of each fold
+    """
+    global _lives_cache
+    snapshot = tuple(_fold_key(cv) for cv in d)
+    if _lives_cache is None:
+        cached_snapshot, cached_lives = (), []
+    else:
+        cached_snapshot, cached_lives = _lives_cache
+    if len(snapshot) == len(cached_snapshot) and all(
+        _same_fold(a, b) for a, b in zip(snapshot, cached_snapshot)
+    ):
+        return cached_lives
+
+    lives = []
+    for key in snapshot:
+        fold_lives = next(
+            (
+                l
+                for cached_key, l in zip(cached_snapshot, cached_lives)
+                if _same_fold(key, cached_key)
+            ),
+            None,
+        )
+        if fold_lives is None:
+            fold_lives = split_lives(key[0])
+        lives.append(fold_lives)
+    _lives_cache = (snapshot, lives)
+    return lives
+
+
+def clear_lives_cache():
+    """
+    Clear the fitted lives cached by unexploited_lifetime, unexpected_breaks and metric_J
+
+    Folds added, removed or replaced are detected, but it must be called
+    if the RUL arrays of a fold are modified in place after computing any
+    of those metrics
+    """
+    global _lives_cache
+    _lives_cache = None
+
+
+def unexploited_lifetime(d: List[PredictionResult], window_size: int, step: int):
+    bb = _lives_for(d)
     return unexploited_lifetime_from_cv(bb, window_size, step)
 
 
+def _end_of_life_arrays(lives: List[FittedLife]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Obtain the predicted and the true end of life of each life
+
+    Parameters:
+        lives: List of fitted lives
+
+    Returns:
+        A tuple of np.arrays with the predicted end of life and the true end of life
+    """
+    predicted_eol = np.fromiter(
+        (life.predicted_end_of_life() for life in lives), dtype=float, count=len(lives)
+    )
+    eol = np.fromiter(
+        (life.end_of_life() for life in lives), dtype=float, count=len(lives)
+    )
+    return predicted_eol, eol
+
+
+def _unexploited_lifetime_matrix(
+    predicted_eol: np.ndarray, eol: np.ndarray, windows: np.ndarray
+) -> np.ndarray:
+    # Equivalent to FittedLife.unexploited_lifetime for every (window, life) pair
+    return np.maximum(eol[None, :] - (predicted_eol[None, :] - windows[:, None]), 0)
+
+
+def _unexpected_break_matrix(
+    predicted_eol: np.ndarray, eol: np.ndarray, windows: np.ndarray
+) -> np.ndarray:
+    # Equivalent to FittedLife.unexpected_break for every (window, life) pair
+    return (predicted_eol[None, :] - windows[:, None]) >= eol[None, :]
+
+
 def unexploited_lifetime_from_cv(
     lives: List[List[FittedLife]], window_size: int, n: int
 ):
-    std_per_window = []
-    mean_per_window = []
     windows = np.linspace(0, window_size, n)
-    for m in windows:
-        jj = []
-        for r in lives:
-            ul_cv_list = [life.unexploited_lifetime(m) for life in r]
-
-            jj.extend(ul_cv_list)
-        mean_per_window.append(np.mean(jj))
-        std_per_window.append(np.std(jj))
-
-    return windows, np.array(mean_per_window), np.array(std_per_window)
+    predicted_eol, eol = _end_of_life_arrays([life for r in lives for life in r])
+    ul = _unexploited_lifetime_matrix(predicted_eol, eol, windows)
+    return windows, np.mean(ul, axis=1), np.std(ul, axis=1)
 
 
 def unexpected_breaks(
@@ -530,7 +660,7 @@ def unexpected_breaks(
             - Risk computed for every window size used
     """
 
-    bb = [split_lives(fold) for fold in d]
+    bb = _lives_for(d)
     return unexpected_breaks_from_cv(bb, window_size, step)
 
 
@@ -551,40 +681,29 @@ def unexpected_breaks_from_cv(
             - Maintenance window size evaluated
             - Risk computed for every window size used
     """
-    std_per_window = []
-    mean_per_window = []
     windows = np.linspace(0, window_size, n)
-    for m in windows:
-        jj = []
-        for r in lives:
-            ul_cv_list = [life.unexpected_break(m) for life in r]
-            jj.extend(ul_cv_list)
-        mean_per_window.append(np.mean(jj))
-        std_per_window.append(np.std(jj))
-    return windows, np.array(mean_per_window), np.array(std_per_window)
+    predicted_eol, eol = _end_of_life_arrays([life for r in lives for life in r])
+    ub = _unexpected_break_matrix(predicted_eol, eol, windows)
+    return windows, np.mean(ub, axis=1), np.std(ub, axis=1)
 
 
 def metric_J_from_cv(lives: List[List[FittedLife]], window_size: int, n: int, q1, q2):
-    J = []
     windows = np.linspace(0, window_size, n)
-    for m in windows:
-        J_of_m = []
-        for r in lives:
-            ub_cv_list = np.array([life.unexpected_break(m) for life in r])
-            ub_cv_list = (ub_cv_list / (np.max(ub_cv_list) + 0.0000000001)) * q1
-            ul_cv_list = np.array([life.unexploited_lifetime(m) for life in r])
-            ul_cv_list = (ul_cv_list / (np.max(ul_cv_list) + 0.0000000001)) * q2
-            values = ub_cv_list + ul_cv_list
-            mean_J = np.mean(values)
-            std_ul_cv = np.std(values)
-            J_of_m.append(mean_J)
-        J.append(np.mean(J_of_m))
-    return windows, J
-
-
-def metric_J(d, window_size: int, step: int):
-    lives_cv = [split_lives(cv) for cv in d]
-    return metric_J_from_cv(lives_cv, window_size, step)
+    J_of_m = []
+    for r in lives:
+        predicted_eol, eol = _end_of_life_arrays(r)
+        ub = _unexpected_break_matrix(predicted_eol, eol, windows)
+        ub = (ub / (np.max(ub, axis=1, keepdims=True) + 0.0000000001)) * q1
+        ul = _unexploited_lifetime_matrix(predicted_eol, eol, windows)
+        ul = (ul / (np.max(ul, axis=1, keepdims=True) + 0.0000000001)) * q2
+        J_of_m.append(np.mean(ub + ul, axis=1))
+    J = np.mean(J_of_m, axis=0)
+    return windows, J.tolist()
+
+
+def metric_J(d, window_size: int, step: int, q1: float = 1, q2: float = 1):
+    lives_cv = _lives_for(d)
+    return metric_J_from_cv(lives_cv, window_size, step, q1, q2)
 
 
 def cv_regression_metrics_single_model(
@@ -593,8 +712,8 @@ def cv_regression_metrics_single_model(
     errors = {"MAE": [], "MAE SW": [], "MSE": [], "MSE SW": [], "MAPE": []}
     for result in results:
         y_mask = np.where(result.true_RUL <= threshold)[0]
-        y_true = np.squeeze(result.true_RUL[y_mask])
-        y_pred = np.squeeze(result.predicted_RUL[y_mask])
+        y_true = result.true_RUL[y_mask]
+        y_pred = result.predicted_RUL[y_mask]
         mask = np.isfinite(y_pred)
         y_pred = y_pred[mask]
         y_true = y_true[mask]
@@ -602,44 +721,30 @@ def cv_regression_metrics_single_model(
         if len(np.unique(y_pred)) == 1:
             continue
 
-        sw = compute_sample_weight(
-            "relative",
-            y_true,
-            y_pred,
-        )
-        try:
-            MAE_SW = mae(
+        MAE = MSE = MAE_SW = MSE_SW = np.nan
+        if len(y_true) > 0 and np.all(np.isfinite(y_true)):
+            # The residuals are traversed once and shared by the four metrics
+            diff = y_true - y_pred
+            abs_diff = np.abs(diff)
+            sq_diff = diff * diff
+            MAE = np.mean(abs_diff)
+            MSE = np.mean(sq_diff)
+
+            sw = compute_sample_weight(
+                "relative",
                 y_true,
                 y_pred,
-                sample_weight=sw,
             )
-        except:
-            MAE_SW = np.nan
-        try:
-            MAE = mae(y_true, y_pred)
-        except:
-            MAE = np.nan
-
-        try:
-            MSE_SW = mse(
-                y_true,
-                y_pred,
-                sample_weight=sw,
-            )
-        except:
-            MSE_SW = np.nan
-
-        try:
-            MSE = mse(y_true, y_pred)
-        except:
-            MSE = np.nan
+            sw_sum = np.sum(sw)
+            if np.isfinite(sw_sum) and sw_sum != 0:
+                MAE_SW = np.dot(sw, abs_diff) / sw_sum
+                MSE_SW = np.dot(sw, sq_diff) / sw_sum
 
         try:
             MAPE = mape(y_true, y_pred)
         except:
             MAPE = np.nan
 
-        lives = split_lives(result)
         errors["MAE"].append(MAE)
         errors["MAE SW"].append(MAE_SW)
         errors["MSE"].append(MSE)
@@ -1,12 +1,237 @@
 import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Union
 
 import numpy as np
 import pandas as pd
 from ceruleo.transformation import TransformerStep
 from ceruleo.transformation.features.tdigest import TDigest
+from ceruleo.transformation.utils import build_tdigest
+from numba import njit
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
 
 logger = logging.getLogger(__name__)
+
+
+# Polars inputs are imputed with polars expressions and returned as polars
+# data frames. Pandas inputs always take the pandas/numpy path.
+def _is_polars(X) -> bool:
+    return pl is not None and isinstance(X, pl.DataFrame)
+
+
+def _polars_missing(X: "pl.DataFrame", c: str) -> "pl.Expr":
+    if X.schema[c].is_float():
+        return pl.col(c).is_null() | pl.col(c).is_nan()
+    return pl.col(c).is_null()
+
+
+def _polars_fill(X: "pl.DataFrame", value: dict) -> "pl.DataFrame":
+    return X.with_columns(
+        [
+            pl.when(_polars_missing(X, c))
+            .then(pl.lit(value[c]))
+            .otherwise(pl.col(c))
+            .alias(c)
+            for c in X.columns
+            if c in value
+        ]
+    )
+
+
+def _polars_inf_to_nan(X: "pl.DataFrame") -> "pl.DataFrame":
+    return X.with_columns(
+        [
+            pl.when(pl.col(c).is_infinite())
+            .then(pl.lit(np.nan))
+            .otherwise(pl.col(c))
+            .alias(c)
+            for c in X.columns
+            if X.schema[c].is_float()
+        ]
+    )
+
+
+def _polars_fill_strategy(X: "pl.DataFrame", strategy: str) -> "pl.DataFrame":
+    return X.with_columns(
+        [pl.col(c).fill_nan(None) for c in X.columns if X.schema[c].is_float()]
+    ).fill_null(strategy=strategy)
+
+
+# The rolling kernels receive the columns with missing values transposed,
+# so that each window is a contiguous slice of a row of XT
+
+
+@njit(cache=True)
+def _rolling_impute_mean_nb(XT, row, feature, min_r, max_r, default_value):
+    out = np.empty(row.shape[0])
+    for i in range(row.shape[0]):
+        f = feature[i]
+        total = 0.0
+        count = 0
+        for j in range(min_r[i], max_r[i]):
+            v = XT[f, j]
+            if np.isfinite(v):
+                total += v
+                count += 1
+        if count > 0:
+            out[i] = total / count
+        else:
+            out[i] = default_value[f]
+    return out
+
+
+@njit(cache=True)
+def _rolling_impute_median_nb(XT, row, feature, min_r, max_r, default_value):
+    out = np.empty(row.shape[0])
+    for i in range(row.shape[0]):
+        f = feature[i]
+        buffer = np.empty(max_r[i] - min_r[i])
+        count = 0
+        for j in range(min_r[i], max_r[i]):
+            v = XT[f, j]
+            if np.isfinite(v):
+                buffer[count] = v
+                count += 1
+        if count > 0:
+            out[i] = np.median(buffer[:count])
+        else:
+            out[i] = default_value[f]
+    return out
+
+
+def _aligned_fill(cache: dict, value: dict, columns: pd.Index) -> np.ndarray:
+    key = tuple(columns)
+    fill = cache.get(key)
+    if fill is None:
+        fill = np.array([value.get(c, np.nan) for c in columns], dtype=np.float64)
+        cache[key] = fill
+    return fill
+
+
+def _map_float_columns(X: pd.DataFrame, func, column_func=None) -> pd.DataFrame:
+    """
+    Apply a function to a copy of the values of the float columns of a life
+
+    The float columns are grouped by dtype, so they keep their precision,
+    and the remaining columns are passed through unchanged
+
+    Parameters:
+        X: The input life
+        func: Function called with a 2D array with the values of a group
+              of columns, to be modified in place, and their positions in X
+        column_func: Function called with each column with a pandas nullable
+                     float dtype and its position in X, that returns the
+                     modified column. If omitted, those columns are passed
+                     through unchanged
+
+    Returns:
+        A new life with the modified values
+    """
+    groups = {}
+    extension_columns = []
+    for j, dtype in enumerate(X.dtypes):
+        if isinstance(dtype, np.dtype):
+            if dtype.kind == "f":
+                groups.setdefault(dtype, []).append(j)
+        elif column_func is not None and pd.api.types.is_float_dtype(dtype):
+            extension_columns.append(j)
+    if len(groups) == 1 and len(next(iter(groups.values()))) == X.shape[1]:
+        values = X.to_numpy(copy=True)
+        func(values, np.arange(X.shape[1]))
+        return pd.DataFrame(values, index=X.index, columns=X.columns)
+    X = X.copy()
+    for dtype, columns in groups.items():
+        columns = np.array(columns)
+        values = X.iloc[:, columns].to_numpy(dtype=dtype, copy=True)
+        func(values, columns)
+        for k, j in enumerate(columns):
+            X.isetitem(j, values[:, k])
+    for j in extension_columns:
+        X.isetitem(j, column_func(X.iloc[:, j], j))
+    return X
+
+
+def _inf_to_nan(X: pd.DataFrame) -> pd.DataFrame:
+    def mask_inf(values, columns):
+        values[np.isinf(values)] = np.nan
+
+    return _map_float_columns(
+        X, mask_inf, lambda column, j: column.replace([np.inf, -np.inf], np.nan)
+    )
+
+
+def _fill_nan(X: pd.DataFrame, fill: np.ndarray) -> pd.DataFrame:
+    def fill_block(values, columns):
+        block_fill = np.broadcast_to(fill[columns].astype(values.dtype), values.shape)
+        np.copyto(values, block_fill, where=np.isnan(values))
+
+    def fill_column(column, j):
+        return column if np.isnan(fill[j]) else column.fillna(fill[j])
+
+    return _map_float_columns(X, fill_block, fill_column)
+
+
+def _reindexed(X: pd.DataFrame, columns: Optional[pd.Index]) -> pd.DataFrame:
+    # Align a life with the columns of the first life fitted. Missing
+    # columns are NaN, so they are not counted in the running statistics
+    if columns is None or X.columns.equals(columns):
+        return X
+    return X.reindex(columns=columns)
+
+
+def _update_running_mean(mean, counts, values: np.ndarray):
+    finite = np.isfinite(values)
+    batch_counts = finite.sum(axis=0)
+    batch_sum = np.where(finite, values, 0.0).sum(axis=0)
+    if mean is None:
+        mean = np.zeros(values.shape[1])
+        counts = np.zeros(values.shape[1], dtype=np.int64)
+    counts = counts + batch_counts
+    valid = batch_counts > 0
+    batch_mean = batch_sum[valid] / batch_counts[valid]
+    mean = mean.copy()
+    mean[valid] += (batch_mean - mean[valid]) * (batch_counts[valid] / counts[valid])
+    return mean, counts
+
+
+@njit(cache=True)
+def _per_column_impute_nb(X, data_max, data_min, data_median, out):
+    for i in range(X.shape[0]):
+        for j in range(X.shape[1]):
+            v = X[i, j]
+            if np.isfinite(v):
+                out[i, j] = v
+            elif v > 0:
+                out[i, j] = data_max[j]
+            elif v < 0:
+                out[i, j] = data_min[j]
+            else:
+                out[i, j] = data_median[j]
+
+
+@njit(cache=True)
+def _ffill_nb(X):
+    last = X[0].copy()
+    for i in range(1, X.shape[0]):
+        for j in range(X.shape[1]):
+            if np.isnan(X[i, j]):
+                X[i, j] = last[j]
+            else:
+                last[j] = X[i, j]
+
+
+# Functions of ApplyRollingImputer computed by a vectorized or compiled kernel
+_ROLLING_IMPUTE_KERNELS = {
+    np.mean: _rolling_impute_mean_nb,
+    np.nanmean: _rolling_impute_mean_nb,
+    np.median: _rolling_impute_median_nb,
+    np.nanmedian: _rolling_impute_median_nb,
+}
            
 
 class PerColumnImputer(TransformerStep):
@@ -27,30 +252,46 @@ class PerColumnImputer(TransformerStep):
         self.data_min = None
         self.data_max = None
         self.data_median = None
+        self.tdigest_dict = None
+        self._columns = None
 
     def partial_fit(self, X:pd.DataFrame, y=None) -> pd.DataFrame:
         """ 
         Fit the transformation incrementally
 
+        The minimum and maximum are merged element-wise and the median is
+        approximated using a tdigest per column. The columns are matched by
+        name with the ones of the first life
+
         Parameters:
             X: The input life
         
         """
-        X = X.replace([np.inf, -np.inf], np.nan)
-        col_to_max = X.max()
-        col_to_min = X.max()
-        col_to_median = X.median()
-        if self.data_min is None:
-            self.data_min = col_to_min
-            self.data_max = col_to_max
-            self.data_median = col_to_median
+        if self.tdigest_dict is None:
+            self._columns = X.columns
+        X = _reindexed(_inf_to_nan(X), self._columns)
+        col_to_max = X.max().to_numpy()
+        col_to_min = X.min().to_numpy()
+        if self.tdigest_dict is None:
+            self.tdigest_dict = {c: TDigest(100) for c in X.columns}
+            self._data_min = col_to_min
+            self._data_max = col_to_max
         else:
-            self.data_min = pd.concat([self.data_min, col_to_min], axis=1).min(axis=1)
-            self.data_max = pd.concat([self.data_max, col_to_max], axis=1).max(axis=1)
-            self.data_median = pd.concat([self.data_max, col_to_median], axis=1).median(
-                axis=1
+            self._data_min = np.fmin(self._data_min, col_to_min)
+            self._data_max = np.fmax(self._data_max, col_to_max)
+        for c in X.columns:
+            values = X[c].values
+            self.tdigest_dict[c] = self.tdigest_dict[c].merge_unsorted(
+                values[~np.isnan(values)]
             )
+
+        self.data_min = pd.Series(self._data_min, index=X.columns)
+        self.data_max = pd.Series(self._data_max, index=X.columns)
+        self.data_median = pd.Series(
+            {c: self.tdigest_dict[c].estimate_quantile(0.5) for c in X.columns}
+        )
         self._remove_na()
+        return self
 
     def _remove_na(self):
         self.data_max.fillna(0, inplace=True)
@@ -65,14 +306,15 @@ class PerColumnImputer(TransformerStep):
             X: The input life
         
         """
-        X = X.replace([np.inf, -np.inf], np.nan)
+        X = _inf_to_nan(X)
         col_to_max = X.max()
-        col_to_min = X.max()
+        col_to_min = X.min()
         col_to_median = X.median()
 
         self.data_min = col_to_min
         self.data_max = col_to_max
         self.data_median = col_to_median
+        self.tdigest_dict = None
 
         self._remove_na()
         return self
@@ -85,12 +327,41 @@ class PerColumnImputer(TransformerStep):
             X: The input life
         
         """
-        X_new = X.copy()
-        for c in X_new.columns:
-            X_new[c].replace([np.inf], self.data_max[c], inplace=True)
-            X_new[c].replace([-np.inf], self.data_min[c], inplace=True)
-            X_new[c].replace([np.nan], self.data_median[c], inplace=True)
-        return X_new
+        if _is_polars(X):
+            return X.with_columns(
+                [
+                    pl.when(pl.col(c) == np.inf)
+                    .then(pl.lit(self.data_max[c]))
+                    .when(pl.col(c) == -np.inf)
+                    .then(pl.lit(self.data_min[c]))
+                    .when(_polars_missing(X, c))
+                    .then(pl.lit(self.data_median[c]))
+                    .otherwise(pl.col(c))
+                    .alias(c)
+                    for c in X.columns
+                ]
+            )
+        data_max = self.data_max.reindex(X.columns).to_numpy(dtype=np.float64)
+        data_min = self.data_min.reindex(X.columns).to_numpy(dtype=np.float64)
+        data_median = self.data_median.reindex(X.columns).to_numpy(dtype=np.float64)
+
+        def impute_block(values, columns):
+            _per_column_impute_nb(
+                values,
+                data_max[columns],
+                data_min[columns],
+                data_median[columns],
+                values,
+            )
+
+        def impute_column(column, j):
+            return (
+                column.replace(np.inf, data_max[j])
+                .replace(-np.inf, data_min[j])
+                .fillna(data_median[j])
+            )
+
+        return _map_float_columns(X, impute_block, impute_column)
 
     def description(self) -> tuple:
         """ 
@@ -129,7 +400,9 @@ class NaNtoInf(TransformerStep):
         Returns:
             A dataframe with she same index as the input with the NaN values replaced with inf
         """
-        return X.replace([np.inf, -np.inf], np.nan)
+        if _is_polars(X):
+            return _polars_inf_to_nan(X)
+        return _inf_to_nan(X)
         #It should be -> X.replace(np.nan,[np.inf, -np.inf])
         #return X.replace(np.nan,np.inf)
 
@@ -139,13 +412,37 @@ class MedianImputer(TransformerStep):
     Impute missing values with the median value of the training set
 
     Parameters:
+        tdigest_size: Maximum number of centroids of the tdigest of each column used in partial_fit, by default 100
+        max_workers: Number of processes used to update the tdigest of each column in partial_fit, by default 1
         name: The name of the step
         
     """
 
-    def __init__(self, *, name: Optional[str] = None):
+    def __init__(
+        self,
+        *,
+        tdigest_size: int = 100,
+        max_workers: int = 1,
+        name: Optional[str] = None
+    ):
         super().__init__(name=name)
         self.tdigest_dict = None
+        self.tdigest_size = tdigest_size
+        self.max_workers = max_workers
+        self._fill_cache = {}
+
+    def __setstate__(self, state: dict):
+        # Steps pickled by previous versions lack the newer attributes
+        self.__dict__.update(state)
+        self.__dict__.setdefault("tdigest_size", 100)
+        self.__dict__.setdefault("max_workers", 1)
+        self.__dict__.setdefault("_fill_cache", {})
+
+    def __sizeof__(self) -> int:
+        size = object.__sizeof__(self) + sys.getsizeof(self.__dict__)
+        if self.tdigest_dict is not None:
+            size += sum(sys.getsizeof(t) for t in self.tdigest_dict.values())
+        return size
 
     def fit(self, X:pd.DataFrame, y=None):
         """Compute the median value
@@ -154,6 +451,7 @@ class MedianImputer(TransformerStep):
             X: The input life
         """
         self.median = X.median(axis=0).to_dict()
+        self._fill_cache = {}
         return self
 
     def partial_fit(self, X:pd.DataFrame):
@@ -163,13 +461,32 @@ class MedianImputer(TransformerStep):
             X: The input life
         """
         if self.tdigest_dict is None:
-            self.tdigest_dict = {c: TDigest() for c in X.columns}
-        for c in X.columns:
-            self.tdigest_dict[c].batch_update(X[c].values)
+            self.tdigest_dict = {c: TDigest(self.tdigest_size) for c in X.columns}
+        values = X.to_numpy(dtype=np.float64)
+        sorted_values = {}
+        for i, c in enumerate(X.columns):
+            x = values[:, i]
+            sorted_values[c] = np.sort(x[np.isfinite(x)])
+
+        if self.max_workers > 1:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                results = [
+                    executor.submit(build_tdigest, self.tdigest_dict[c], x, c)
+                    for c, x in sorted_values.items()
+                ]
+            for r in results:
+                c, tdigest = r.result()
+                self.tdigest_dict[c] = tdigest
+        else:
+            for c, x in sorted_values.items():
+                self.tdigest_dict[c] = self.tdigest_dict[c].merge_sorted(x)
 
         self.median = {
-            c: self.tdigest_dict[c].percentile(50) for c in self.tdigest_dict.keys()
+            c: self.tdigest_dict[c].estimate_quantile(0.5)
+            for c in self.tdigest_dict.keys()
         }
+        self._fill_cache = {}
+        return self
 
     def transform(self, X: pd.DataFrame, y=None) -> pd.DataFrame:
         """
@@ -182,7 +499,9 @@ class MedianImputer(TransformerStep):
         Returns:
             A new DataFrame with the same index as the input with the Na values replaced by the fitted median
         """
-        return X.fillna(value=self.median)
+        if _is_polars(X):
+            return _polars_fill(X, self.median)
+        return _fill_nan(X, _aligned_fill(self._fill_cache, self.median, X.columns))
 
 
 class MeanImputer(TransformerStep):
@@ -193,23 +512,74 @@ class MeanImputer(TransformerStep):
         
     """
 
+    # Number of values buffered by partial_fit before updating the running mean
+    _FLUSH_AT = 2**20
+
     def __init__(self, *, name: Optional[str] = None):
         super().__init__(name=name)
-        self.sum = None
+        self.running_mean = None
+        self.counts = None
+        self._mean = None
+        self._columns = None
+        self._pending = []
+        self._pending_size = 0
+        self._fill_cache = {}
+
+    def __setstate__(self, state: dict):
+        # Steps pickled by previous versions store the mean as an attribute
+        # and lack the newer attributes
+        state = dict(state)
+        if "mean" in state:
+            state["_mean"] = state.pop("mean")
+        self.__dict__.update(state)
+        self.__dict__.setdefault("running_mean", None)
+        self.__dict__.setdefault("_mean", None)
+        self.__dict__.setdefault("_columns", None)
+        self.__dict__.setdefault("_pending", [])
+        self.__dict__.setdefault("_pending_size", 0)
+        self.__dict__.setdefault("_fill_cache", {})
+
+    @property
+    def mean(self) -> dict:
+        """Mean value of each feature"""
+        self._flush()
+        return self._mean
+
+    @mean.setter
+    def mean(self, value: dict):
+        self._mean = value
+
+    def _flush(self):
+        if len(self._pending) == 0:
+            return
+        block = np.concatenate(self._pending, axis=0)
+        self._pending = []
+        self._pending_size = 0
+        self.running_mean, self.counts = _update_running_mean(
+            self.running_mean, self.counts, block
+        )
+        self._mean = dict(zip(self._columns, self.running_mean))
 
     def partial_fit(self, X:pd.DataFrame, y=None):
         """Compute the mean value incrementally
 
+        The lives are buffered and reduced together once enough values are
+        pending. The mean of the finite values of each column is merged with
+        the running mean weighted by the number of values seen. The columns
+        are matched by name with the ones of the first life
+
         Parameters:
             X: The input life  
         """
-        if self.sum is None:
-            self.sum = X.sum(axis=0)
-            self.counts = X.shape[0]
-        else:
-            self.sum += X.sum(axis=0)
-            self.counts += X.shape[0]
-        self.mean = (self.sum / self.counts).to_dict()
+        if self._columns is None:
+            self._columns = X.columns
+        self._pending.append(
+            _reindexed(X, self._columns).to_numpy(dtype=np.float64, copy=True)
+        )
+        self._pending_size += X.size
+        if self._pending_size >= self._FLUSH_AT:
+            self._flush()
+        self._fill_cache = {}
         return self
 
     def fit(self, X:pd.DataFrame, y=None):
@@ -218,7 +588,10 @@ class MeanImputer(TransformerStep):
         Parameters:
             X: The input life  
         """
+        self._pending = []
+        self._pending_size = 0
         self.mean = X.mean(axis=0).to_dict()
+        self._fill_cache = {}
         return self
 
     def transform(self, X: pd.DataFrame, y=None) -> pd.DataFrame:
@@ -230,13 +603,20 @@ class MeanImputer(TransformerStep):
         Returns:
             A new DataFrame with the same index as the input with the Na values replaced by the fitted mean
         """
-        return X.fillna(value=self.mean)
+        if _is_polars(X):
+            return _polars_fill(X, self.mean)
+        return _fill_nan(X, _aligned_fill(self._fill_cache, self.mean, X.columns))
 
 
 class ApplyRollingImputer(TransformerStep):
     """
     Impute missing values using a function over a rolling window
 
+    If the function is np.mean or np.median (or their nan versions) the windows
+    are aggregated in compiled code using only the finite values of the input
+    life. Otherwise, the function is called for each missing value, and values
+    imputed previously are part of the subsequent windows.
+
     Parameters:
         window_size: Window size of the rolling window
         func: The function to call in each window
@@ -248,7 +628,9 @@ class ApplyRollingImputer(TransformerStep):
         self.window_size = window_size
         self.function = func
         self.mean_value_list = []
-        self.sum = None
+        self.running_mean = None
+        self.counts = None
+        self._columns = None
 
     def partial_fit(self, X: pd.DataFrame):
         """
@@ -257,26 +639,53 @@ class ApplyRollingImputer(TransformerStep):
         Parameters:
             X: The input life
         """
-        if self.sum is None:
-            self.sum = X.sum(axis=0)
-            self.counts = X.shape[0]
-        else:
-            self.sum += X.sum(axis=0)
-            self.counts += X.shape[0]
-        self.default_value = (self.sum / self.counts).to_dict()
+        if self.running_mean is None:
+            self._columns = X.columns
+        self.running_mean, self.counts = _update_running_mean(
+            self.running_mean,
+            self.counts,
+            _reindexed(X, self._columns).to_numpy(dtype=np.float64),
+        )
+        self.default_value = np.nan_to_num(
+            self.running_mean, nan=0.0, posinf=0.0, neginf=0.0
+        )
         return self
 
     def fit(self, X: pd.DataFrame):
         """
         Compute a default value in case there are not valid values in the rolling window
 
+        The default value of each feature is the mean of its finite values,
+        stored in an array ordered as the columns of the life
+
         Parameters:
             X: The input life
         """
-        self.default_value = np.mean(X, axis=0)
-        self.default_value[~np.isfinite(self.default_value)] = 0
+        default_value, _ = _update_running_mean(
+            None, None, X.to_numpy(dtype=np.float64)
+        )
+        self._columns = X.columns
+        self.default_value = np.nan_to_num(
+            default_value, nan=0.0, posinf=0.0, neginf=0.0
+        )
         return self
 
+    def _aligned_default_value(self, columns: pd.Index) -> np.ndarray:
+        default_value = self.default_value
+        if not isinstance(default_value, np.ndarray):
+            # Steps fitted before the default value was stored as an array
+            default_value = pd.Series(default_value)
+            return default_value.reindex(columns).fillna(0.0).to_numpy(dtype=np.float64)
+        fitted_columns = getattr(self, "_columns", None)
+        if fitted_columns is None or fitted_columns.equals(columns):
+            return default_value
+        return (
+            pd.Series(default_value, index=fitted_columns)
+            .reindex(columns)
+            .fillna(0.0)
+            .to_numpy(dtype=np.float64)
+        )
+
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
         """
         Transform the input life
@@ -287,15 +696,29 @@ class ApplyRollingImputer(TransformerStep):
         Returns:
             A new life with the same index as the input with the missing values replaced by the output of the function supplied
         """
-        X = X.copy()
-        
-        row, features = np.where(~np.isfinite(X))
+        values = X.to_numpy(dtype=np.float64)
+        # Missing cells sorted by column and then by row
+        features, row = np.nonzero(~np.isfinite(values.T))
+        columns, feature_index = np.unique(features, return_inverse=True)
+        XT = values.T[columns]
         min_limit = np.maximum(row - self.window_size, 0)
         max_limit = np.minimum(row + self.window_size, X.shape[0])
-        for r, min_r, max_r, f in zip(row, min_limit, max_limit, features):
-            X.iloc[r, f] = self.function(X.iloc[min_r:max_r, f].values)
-            if ~np.isfinite(X.iloc[r, f]):
-                X.iloc[r, f] = self.default_value[X.columns[f]]
+        default_value = self._aligned_default_value(X.columns)[columns]
+
+        kernel = _ROLLING_IMPUTE_KERNELS.get(self.function)
+        if kernel is not None:
+            XT[feature_index, row] = kernel(
+                XT, row, feature_index, min_limit, max_limit, default_value
+            )
+        else:
+            for r, min_r, max_r, f in zip(row, min_limit, max_limit, feature_index):
+                XT[f, r] = self.function(XT[f, min_r:max_r])
+                if ~np.isfinite(XT[f, r]):
+                    XT[f, r] = default_value[f]
+
+        X = X.copy()
+        for f, c in enumerate(columns):
+            X.iloc[:, c] = XT[f]
         return X
 
 
@@ -307,7 +730,7 @@ class RollingMedianImputer(ApplyRollingImputer):
     """
 
     def __init__(self, *, window_size: int, name:str=None):
-        super().__init__(window_size, func=np.median, name=name)
+        super().__init__(window_size=window_size, func=np.median, name=name)
 
 
 class RollingMeanImputer(ApplyRollingImputer):
@@ -335,9 +758,15 @@ class ForwardFillImputer(TransformerStep):
         Returns:
             A new life with the same index as the input with the missing values replaced by the value in the succesive timestamp 
         """
+        if _is_polars(X):
+            return _polars_fill_strategy(X, "forward")
         if not isinstance(X, pd.DataFrame):
             raise ValueError("Input array must be a data frame")
-        return X.ffill()
+        if X.shape[0] == 0 or not all(
+            isinstance(d, np.dtype) and d.kind == "f" for d in X.dtypes
+        ):
+            return X.ffill()
+        return _map_float_columns(X, lambda values, columns: _ffill_nb(values))
 
 
 class BackwardFillImputer(TransformerStep):
@@ -353,6 +782,8 @@ class BackwardFillImputer(TransformerStep):
         Returns:
             A new life with the same index as the input with the missing values replaced by the value in the previous timestamp 
         """
+        if _is_polars(X):
+            return _polars_fill_strategy(X, "backward")
         if not isinstance(X, pd.DataFrame):
             raise ValueError("Input array must be a data frame")
         return X.bfill()
@@ -375,4 +806,6 @@ class FillImputer(TransformerStep):
         Returns:
             A new life with the same index as the input with the missing values replaced by the value specified in the input 
         """
+        if _is_polars(X):
+            return _polars_fill(X, {c: self.value for c in X.columns})
         return X.fillna(value=self.value)
@@ -1,8 +1,22 @@
 import numpy as np 
-from typing import Callable
+from numba import njit, prange
+from typing import Callable, Optional, Tuple, Union
+
+_FAST_REDUCTIONS = {
+    np.mean: np.mean,
+    np.std: np.std,
+    np.min: np.min,
+    np.max: np.max,
+    np.sum: np.sum,
+    "mean": np.mean,
+    "std": np.std,
+    "min": np.min,
+    "max": np.max,
+    "sum": np.sum,
+}
 
 # Window len = L, Stride len/stepsize = S
-def _strided_app(a: np.array, L: int, S: int) -> np.array:  
+def _strided_app(a: np.array, L: int, S: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:  
     """
     Returns an array that is strided
 
@@ -10,8 +24,12 @@ def _strided_app(a: np.array, L: int, S: int) -> np.array:
         a: Array to be strided
         L: Length of the window
         S: Stride (S=L/stepsize)
+
+    Returns:
+        A tuple with the read-only strided view of shape (nrows, L) and 
+        the remaining elements of `a` not covered by the view (None if there are none)
     """
-    nrows = ((a.size-L)//S)+1
+    nrows = max(((a.size-L)//S)+1, 0)
     n = a.strides[0]
     r =  np.lib.stride_tricks.as_strided(
         a, 
@@ -19,13 +37,20 @@ def _strided_app(a: np.array, L: int, S: int) -> np.array:
         strides=(S*n, n),
         writeable=False)
     last = r.shape[0]*r.shape[1]
-    l = r.tolist()
+    tail = None
     if last < len(a):
-        l.append(a[last:])
-    return l
+        tail = a[last:]
+    return r, tail
     
 
-def apply_rolling_data(values : np.ndarray, function: Callable[[np.ndarray], np.ndarray], window: int, step: int =1) -> np.array:
+def _fast_reduction(function) -> Optional[Callable]:
+    try:
+        return _FAST_REDUCTIONS.get(function)
+    except TypeError:
+        return None
+
+
+def apply_rolling_data(values : np.ndarray, function: Union[str, Callable[[np.ndarray], np.ndarray]], window: int, step: int =1) -> np.array:
     """
     Perform a rolling window analysis at the column `col` from `data`
 
@@ -33,15 +58,110 @@ def apply_rolling_data(values : np.ndarray, function: Callable[[np.ndarray], np.
 
     Parameters:
         values: 1-D Time series of data
-        function: Function to be called to calculate the rolling window analysis, the function must receive as input an array or pandas series. Its output must be either a number or a pandas series
+        function: Function to be called to calculate the rolling window analysis, the function must receive as input an array or pandas series. Its output must be either a number or a pandas series,
+                  with the same shape for every complete window.
+                  Each window is passed as a read-only view of `values`, so the function must not modify it
+                  in place (use `np.sort(x)` instead of `x.sort()`, or copy it first).
+                  The reductions np.mean, np.std, np.min, np.max and np.sum (or their names as strings) are computed
+                  in a single vectorized call over all the windows
         window: Length of the window to perform the analysis
         step: Step to take between two consecutive windows, by default 1
 
     Returns:
         data: Columns generated by the function applied
     """
+    values = np.asarray(values)
+    x, tail = _strided_app(values, window, step)
+    reduction = _fast_reduction(function)
+    if reduction is not None:
+        out = reduction(x, axis=1)
+        if tail is not None:
+            out = np.append(out, reduction(tail))
+        return out.reshape(-1, 1)
+    if isinstance(function, str):
+        raise ValueError(f"Invalid reduction {function}")
+    if x.shape[0] == 0:
+        # The series is shorter than the window, so it is all in the tail
+        if tail is None:
+            return np.empty((0, 1))
+        return np.atleast_2d(function(tail))
+    # Every window produces the same shape, so the output is allocated
+    # once from the first result and filled in place
+    first = np.atleast_2d(function(x[0]))
+    rows = first.shape[0]
+    tail_out = None
+    total_rows = x.shape[0] * rows
+    if tail is not None:
+        tail_out = np.atleast_2d(function(tail))
+        total_rows += tail_out.shape[0]
+    out = np.empty((total_rows, first.shape[1]), dtype=first.dtype)
+    out[:rows] = first
+    for i in range(1, x.shape[0]):
+        out[i * rows : (i + 1) * rows] = np.atleast_2d(function(x[i]))
+    if tail_out is not None:
+        out[x.shape[0] * rows :] = tail_out
+    return out
 
-    x = _strided_app(values, window, step)
 
-    return np.vstack([function(np.array(b)) for b in x])
-    
+def _rolling_scalar(values, kernel, window, step, out):
+    for i in prange(out.shape[0]):
+        out[i] = kernel(values[i * step : i * step + window])
+
+
+def _rolling_vector(values, kernel, window, step, out):
+    for i in prange(out.shape[0]):
+        out[i, :] = kernel(values[i * step : i * step + window])
+
+
+# prange behaves as range in the serial versions
+_rolling_scalar_nb = njit(_rolling_scalar)
+_rolling_vector_nb = njit(_rolling_vector)
+_rolling_scalar_parallel_nb = njit(parallel=True)(_rolling_scalar)
+_rolling_vector_parallel_nb = njit(parallel=True)(_rolling_vector)
+
+
+def apply_rolling_data_numba(
+    values: np.ndarray,
+    kernel: Callable[[np.ndarray], np.ndarray],
+    window: int,
+    step: int = 1,
+    parallel: bool = False,
+) -> np.array:
+    """
+    Perform a rolling window analysis with a numba compiled kernel
+
+    The loop over the windows is executed in compiled code, so the per-window
+    overhead of calling a Python function is avoided. 
+
+    The windows can be distributed among threads with `parallel=True`. 
+    This starts the numba parallel runtime, which with the TBB threading layer
+    can hang the interpreter at exit; set `NUMBA_THREADING_LAYER=workqueue` 
+    or `omp` if that happens.
+
+    Parameters:
+        values: 1-D Time series of data
+        kernel: A `numba.njit` decorated function that receives the values of a window.
+                It must return either a scalar or a vector of fixed size
+        window: Length of the window to perform the analysis
+        step: Step to take between two consecutive windows, by default 1
+        parallel: Whether to process the windows in parallel, by default False
+
+    Returns:
+        data: Array of shape (number of windows, output size of the kernel) 
+    """
+    values = np.ascontiguousarray(values)
+    x, tail = _strided_app(values, window, step)
+    nrows = x.shape[0]
+    probe = np.asarray(kernel(values[:window]))
+    if probe.ndim == 0:
+        out = np.empty(nrows, dtype=probe.dtype)
+        rolling = _rolling_scalar_parallel_nb if parallel else _rolling_scalar_nb
+        rolling(values, kernel, window, step, out)
+        out = out.reshape(-1, 1)
+    else:
+        out = np.empty((nrows, probe.size), dtype=probe.dtype)
+        rolling = _rolling_vector_parallel_nb if parallel else _rolling_vector_nb
+        rolling(values, kernel, window, step, out)
+    if tail is not None:
+        out = np.vstack((out, np.asarray(kernel(tail)).reshape(1, -1)))
+    return out
@@ -1,4 +1,5 @@
 import math
+import sys
 
 import numpy as np
 from typing import Iterable, List
@@ -47,6 +48,8 @@ def inplace_merge(arr, start, mid, end):
 
 
 class Centroid:
+    __slots__ = ("mean", "weight")
+
     def __init__(self, mean: float = 0.0, weight: float = 1.0):
         assert weight > 0
         self.mean = mean
@@ -75,6 +78,16 @@ class Centroid:
     def __lt__(self, other):
         return self.mean < other.mean
 
+    def __getstate__(self):
+        return {"mean": self.mean, "weight": self.weight}
+
+    def __setstate__(self, state):
+        # Centroids pickled before __slots__ was added store their __dict__
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **(state[1] or {})}
+        self.mean = state["mean"]
+        self.weight = state["weight"]
+
 
 class TDigest:
     def __init__(self, maxSize: int = 100):
@@ -85,6 +98,14 @@ class TDigest:
         self.min = np.nan
         self.centroids = []
 
+    def __sizeof__(self) -> int:
+        return (
+            object.__sizeof__(self)
+            + sys.getsizeof(self.__dict__)
+            + sys.getsizeof(self.centroids)
+            + sum(sys.getsizeof(c) for c in self.centroids)
+        )
+
     def construct(
         centroids: List[Centroid],
         sum: float,
@@ -280,11 +301,15 @@ class TDigest:
         TDigest
             [description]
         """
-        return self.merge_sorted(sorted(unsortedValues))
+        return self.merge_sorted(np.sort(np.asarray(unsortedValues, dtype=np.float64)))
 
     def merge_sorted(self, sortedValues: Iterable[float]):
         if len(sortedValues) == 0:
             return self
+        if isinstance(sortedValues, np.ndarray):
+            # Iterating a list of python floats is much faster than
+            # indexing numpy scalars in the merge loop
+            sortedValues = sortedValues.tolist()
 
         result = TDigest(self.maxSize)
 
@@ -312,7 +337,7 @@ class TDigest:
 
         cur = None
 
-        if (it_centroids < len(self.centroids) - 1) and (
+        if (it_centroids < len(self.centroids)) and (
             self.centroids[it_centroids].mean < sortedValues[it_sortedValues]
         ):
             cur = self.centroids[it_centroids]
@@ -327,13 +352,13 @@ class TDigest:
         sumsToMerge = 0.0
         weightsToMerge = 0.0
 
-        while (it_centroids < len(self.centroids) - 1) or (
-            it_sortedValues < len(sortedValues) - 1
+        while (it_centroids < len(self.centroids)) or (
+            it_sortedValues < len(sortedValues)
         ):
             next = None
 
-            if (it_centroids < len(self.centroids) - 1) and (
-                (it_sortedValues == len(sortedValues) - 1)
+            if (it_centroids < len(self.centroids)) and (
+                (it_sortedValues == len(sortedValues))
                 or (self.centroids[it_centroids].mean < sortedValues[it_sortedValues])
             ):
                 next = self.centroids[it_centroids]
@@ -7,6 +7,7 @@ from ceruleo.iterators.batcher import Batcher
 from ceruleo.transformation.features.scalers import MinMaxScaler
 from ceruleo.transformation.features.selection import ByNameFeatureSelector
 from ceruleo.transformation import ( Transformer)
+import gc
 import math
 
 class MockDataset(AbstractTimeSeriesDataset):
@@ -63,6 +64,8 @@ class TestBatcher():
         assert X.shape[0] == batch_size
         assert X.shape[1] == window_size
         assert X.shape[2] == 2
+        assert X.dtype == np.float32
+        assert y.dtype == np.float32
 
 
         features = ['feature1', 'feature2']
@@ -84,4 +87,50 @@ class TestBatcher():
         assert len(y.ravel()) == batch_size
         assert X.shape[0] == batch_size
         assert X.shape[1] == window_size
-        assert X.shape[2] == 2
\ No newline at end of file
+        assert X.shape[2] == 2
+    def test_batcher_prefetch(self):
+        features = ['feature1', 'feature2']
+        x = ByNameFeatureSelector(features=features)
+        x = MinMaxScaler(range=(-1, 1))(x)
+
+        y = ByNameFeatureSelector(features=['RUL'])
+        transformer = Transformer(x, y)
+
+        batch_size = 15
+        window_size = 5
+        ds = MockDataset(5)
+        transformer.fit(ds)
+        b = Batcher.new(ds.map(transformer), window_size, batch_size, 1)
+        expected = [(X.copy(), y.copy()) for X, y, w in b]
+
+        b = Batcher.new(ds.map(transformer), window_size, batch_size, 1, prefetch=2)
+        assert len(b) == len(expected)
+        for _ in range(2):
+            batches = [(X.copy(), y.copy()) for X, y, w in b]
+            assert len(batches) == len(expected)
+            for (X, y), (X_e, y_e) in zip(batches, expected):
+                assert np.all(X == X_e)
+                assert np.all(y == y_e)
+
+        b = Batcher.new(ds.map(transformer), window_size, batch_size, 1, prefetch=1)
+        X, y, w = next(b)
+        assert X.shape[0] == batch_size
+        iter(b)
+        X_first, y_first, w = next(b)
+        assert np.all(X_first == expected[0][0])
+
+        producer = b._producer
+        b.close()
+        assert not producer.is_alive()
+
+        b = Batcher.new(ds.map(transformer), window_size, batch_size, 1, prefetch=1)
+        for X, y, w in b:
+            break
+        producer = b._producer
+        del b
+        for _ in range(50):
+            gc.collect()
+            producer.join(timeout=0.1)
+            if not producer.is_alive():
+                break
+        assert not producer.is_alive()
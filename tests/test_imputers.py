@@ -1,11 +1,19 @@
 
 
+import pickle
+import sys
+
 import numpy as np
 import pandas as pd
 import pytest
-from ceruleo.transformation.features.imputers import (ForwardFillImputer,
+from ceruleo.transformation.features.imputers import (BackwardFillImputer,
+                                                       FillImputer,
+                                                       ForwardFillImputer,
                                                        MeanImputer, ApplyRollingImputer,
-                                                       MedianImputer, NaNtoInf)
+                                                       MedianImputer, NaNtoInf,
+                                                       PerColumnImputer,
+                                                       RollingMeanImputer,
+                                                       RollingMedianImputer)
 
 
 class TestImputers():
@@ -43,6 +51,22 @@ class TestImputers():
         assert pd.isnull(df_new['a'][2])
         assert pd.isnull(df_new['b'][4])
 
+        mixed = pd.DataFrame({
+            'a': np.array([0, np.inf, -np.inf], dtype=np.float32),
+            'b': [1, 2, 3],
+            'c': ['x', 'y', 'z'],
+        })
+        df_new = remover.transform(mixed)
+        assert list(df_new.dtypes) == list(mixed.dtypes)
+        assert pd.isnull(df_new['a'][1]) and pd.isnull(df_new['a'][2])
+        assert np.isinf(mixed['a'][1])
+        pd.testing.assert_series_equal(df_new['c'], mixed['c'])
+
+        nullable = pd.DataFrame({'a': pd.array([1.0, np.inf, -np.inf], dtype='Float64')})
+        df_new = remover.transform(nullable)
+        assert df_new['a'].dtype == 'Float64'
+        assert df_new['a'][0] == 1 and df_new['a'][1:].isna().all()
+
     def test_PandasMedianImputer(self):
 
         remover = MedianImputer()
@@ -60,6 +84,56 @@ class TestImputers():
         assert df_new['a'][2] == pytest.approx(a_median)
         assert df_new['b'][2] == pytest.approx(b_median)
 
+        remover = MedianImputer()
+        remover.partial_fit(df.iloc[:4])
+        remover.partial_fit(df.iloc[4:])
+        df_new = remover.transform(df)
+        assert not (pd.isnull(df_new).any().any())
+        assert df_new['a'][1] == pytest.approx(a_median, abs=0.2)
+        assert df_new['b'][2] == pytest.approx(b_median, abs=1)
+
+    def test_MedianImputer_workers(self):
+        df = pd.DataFrame({
+            'a': [0, np.nan, np.nan, 0.1, 0.9, 15, 0.5, 0.3, 0.5],
+            'b': [5, 6,   np.nan,   5,   9,   5,  6,   5,   45],
+        })
+        serial = MedianImputer()
+        parallel = MedianImputer(max_workers=2)
+        for imputer in [serial, parallel]:
+            imputer.partial_fit(df.iloc[:4])
+            imputer.partial_fit(df.iloc[4:])
+        assert parallel.median == pytest.approx(serial.median)
+
+    def test_MedianImputer_tdigest_size(self):
+        x = np.random.default_rng(0).normal(size=(5000, 2))
+        small = MedianImputer(tdigest_size=20)
+        large = MedianImputer(tdigest_size=200)
+        for i in range(5):
+            small.partial_fit(pd.DataFrame(x[i*1000:(i+1)*1000]))
+            large.partial_fit(pd.DataFrame(x[i*1000:(i+1)*1000]))
+        assert len(small.tdigest_dict[0].centroids) <= 20
+        assert sys.getsizeof(small) < sys.getsizeof(large)
+        assert small.median[0] == pytest.approx(np.median(x[:, 0]), abs=0.1)
+
+    def test_pickled_MedianImputer(self):
+        df = pd.DataFrame({
+            'a': [0, np.nan, np.nan, 0.1, 0.9, 15, 0.5, 0.3, 0.5],
+            'b': [5, 6,   np.nan,   5,   9,   5,  6,   5,   45],
+        })
+        imputer = MedianImputer(tdigest_size=20)
+        imputer.partial_fit(df)
+        restored = pickle.loads(pickle.dumps(imputer))
+        assert restored.median == imputer.median
+        assert restored.transform(df).equals(imputer.transform(df))
+
+        state = dict(imputer.__dict__)
+        del state['_fill_cache'], state['tdigest_size'], state['max_workers']
+        old = MedianImputer.__new__(MedianImputer)
+        old.__setstate__(state)
+        assert old.transform(df)['b'][2] == pytest.approx(imputer.median['b'])
+        old.partial_fit(df)
+        assert len(old.tdigest_dict['a'].centroids) <= 100
+
     def test_PandasMeanImputer(self):
 
         remover = MeanImputer()
@@ -78,6 +152,84 @@ class TestImputers():
 
         assert df_new['b'][2] == pytest.approx(b_mean)
 
+        remover = MeanImputer()
+        remover.partial_fit(df.iloc[:4])
+        remover.partial_fit(df.iloc[4:])
+        df_new = remover.transform(df)
+        assert df_new['a'][1] == pytest.approx(a_mean)
+        assert df_new['b'][2] == pytest.approx(b_mean)
+
+        df_new = remover.transform(df[['b', 'a']])
+        assert df_new['a'][1] == pytest.approx(a_mean)
+        assert df_new['b'][2] == pytest.approx(b_mean)
+        assert len(remover._fill_cache) == 2
+        remover.fit(df.fillna(0))
+        assert len(remover._fill_cache) == 0
+        assert remover.transform(df)['a'][1] == pytest.approx(df['a'].fillna(0).mean())
+
+        x = np.random.default_rng(0).normal(size=(1000, 3))
+        x[x > 2] = np.nan
+        remover = MeanImputer()
+        remover._FLUSH_AT = 500
+        for i in range(0, 1000, 50):
+            remover.partial_fit(pd.DataFrame(x[i:i+50]))
+            assert len(remover._pending) < 4
+        assert remover.mean[0] == pytest.approx(np.nanmean(x[:, 0]))
+        assert len(remover._pending) == 0
+        assert remover.counts.sum() == np.isfinite(x).sum()
+
+        mixed = pd.DataFrame({
+            'a': np.array([0, np.nan, 0.5], dtype=np.float32),
+            'b': [1, 2, 3],
+            'c': ['x', 'y', 'z'],
+            'd': [np.nan, 1.0, 2.0],
+        })
+        remover = MeanImputer().fit(mixed[['a', 'b', 'd']])
+        df_new = remover.transform(mixed)
+        assert list(df_new.dtypes) == list(mixed.dtypes)
+        assert df_new['a'][1] == pytest.approx(0.25)
+        assert df_new['d'][0] == pytest.approx(1.5)
+        pd.testing.assert_series_equal(df_new['b'], mixed['b'])
+        pd.testing.assert_series_equal(df_new['c'], mixed['c'])
+        assert np.isnan(mixed['a'][1])
+
+        nullable = pd.DataFrame({'a': pd.array([1.0, None, 3.0], dtype='Float64')})
+        df_new = MeanImputer().fit(nullable).transform(nullable)
+        assert df_new['a'].dtype == 'Float64'
+        assert df_new['a'].tolist() == [1.0, 2.0, 3.0]
+        df_new = MedianImputer().fit(nullable).transform(nullable.assign(b=1))
+        assert df_new['a'].tolist() == [1.0, 2.0, 3.0]
+
+        remover = MeanImputer()
+        remover.partial_fit(df.iloc[:4])
+        remover.partial_fit(df.iloc[4:][['b', 'a']])
+        assert remover.mean['a'] == pytest.approx(a_mean)
+        assert remover.mean['b'] == pytest.approx(b_mean)
+        remover.partial_fit(df[['b']])
+        assert remover.mean['a'] == pytest.approx(a_mean)
+        assert remover.mean['b'] == pytest.approx(np.nanmean(np.hstack([df['b'], df['b']])))
+
+    def test_pickled_MeanImputer(self):
+        df = pd.DataFrame({'a': [0, np.nan, 1.0], 'b': [5, 6, np.nan]})
+        imputer = MeanImputer()
+        imputer.partial_fit(df)
+        restored = pickle.loads(pickle.dumps(imputer))
+        assert restored.mean == pytest.approx(imputer.mean)
+        assert restored.transform(df).equals(imputer.transform(df))
+
+        state = dict(MeanImputer().__dict__)
+        for attr in ['running_mean', '_mean', '_columns', '_pending', '_pending_size', '_fill_cache']:
+            del state[attr]
+        state.update({'mean': {'a': 0.5, 'b': 5.5}, 'sum': None})
+        old = MeanImputer.__new__(MeanImputer)
+        old.__setstate__(state)
+        assert old.mean == {'a': 0.5, 'b': 5.5}
+        df_new = old.transform(df)
+        assert df_new['a'][1] == 0.5
+        assert df_new['b'][2] == 5.5
+        old.partial_fit(df)
+        assert old.mean['a'] == pytest.approx(0.5)
+
     def test_ForwardFillImputer(self):
 
         remover = ForwardFillImputer()
@@ -92,3 +244,185 @@ class TestImputers():
         assert df_new['a'][2] == pytest.approx(0.5)
 
         assert df_new['b'][4] == pytest.approx(5)
+
+        df = pd.DataFrame({
+            'a': [np.nan, 0.5, np.nan, np.nan, 0.9],
+            'b': [5, 6, 7, 5, 8],
+        })
+        df_new = remover.fit_transform(df)
+        assert np.isnan(df_new['a'][0])
+        assert df_new['a'][3] == pytest.approx(0.5)
+        assert df_new['b'].dtype == df['b'].dtype
+        df['b'] = df['b'].astype(float)
+        pd.testing.assert_frame_equal(remover.transform(df), df.ffill())
+        df['b'] = df['b'].astype(np.float32)
+        df_new = remover.transform(df)
+        assert df_new['b'].dtype == np.float32
+        pd.testing.assert_frame_equal(df_new, df.ffill())
+        df['a'] = df['a'].astype(np.float32)
+        pd.testing.assert_frame_equal(remover.transform(df), df.ffill())
+
+    def test_RollingImputers(self):
+        df = pd.DataFrame({
+            'a': [0, np.nan, 12, -np.inf, 0.9, 15, 0.5, 0.3, 0.5],
+            'b': [5, 6, 7, 5, np.inf, 5, 6, 5, 45],
+        })
+        f = RollingMeanImputer(window_size=2)
+        f.fit(df)
+        df_new = f.transform(df)
+        assert np.all(np.isfinite(df_new))
+        assert df_new['a'][1] == pytest.approx(6)
+        assert df_new['a'][3] == pytest.approx(np.mean([12, 0.9]))
+        assert df_new['b'][4] == pytest.approx(np.mean([7, 5, 5]))
+        assert df_new['b'][0] == 5
+
+        f = RollingMedianImputer(window_size=2)
+        f.fit(df)
+        df_new = f.transform(df)
+        assert np.all(np.isfinite(df_new))
+        assert df_new['a'][1] == pytest.approx(6)
+        assert df_new['a'][3] == pytest.approx(np.median([12, 0.9]))
+        assert df_new['b'][4] == pytest.approx(5)
+
+        df = pd.DataFrame({'a': [np.nan, np.nan, np.nan, 1.0, 3.0]})
+        f = RollingMeanImputer(window_size=1)
+        f.fit(df)
+        df_new = f.transform(df)
+        assert df_new['a'][0] == pytest.approx(2)
+        assert isinstance(f.default_value, np.ndarray)
+        f.partial_fit(df)
+        assert f.default_value == pytest.approx([2])
+
+        x = np.full(60, 1.5)
+        x[0] = 3e38
+        x[30] = np.nan
+        f = RollingMeanImputer(window_size=3)
+        df_new = f.fit_transform(pd.DataFrame({'a': x}))
+        assert df_new['a'][30] == pytest.approx(1.5)
+
+        f = RollingMeanImputer(window_size=1)
+        f.partial_fit(pd.DataFrame({'a': [1e308, 1e308], 'b': [np.nan, np.nan]}))
+        assert np.all(f.default_value == 0)
+        df_new = f.transform(pd.DataFrame({'a': [np.nan, 1.0], 'b': [np.nan, 1.0]}))
+        assert df_new['a'][0] == 0
+        assert df_new['b'][0] == 0
+
+        f = RollingMeanImputer(window_size=1)
+        f.partial_fit(pd.DataFrame({'a': [1.0, 3.0], 'b': [10.0, np.nan]}))
+        f.partial_fit(pd.DataFrame({'b': [30.0, 20.0], 'a': [np.nan, 5.0]}))
+        assert f.default_value == pytest.approx([3, 20])
+        df_new = f.transform(pd.DataFrame({'b': [np.nan, np.nan], 'a': [np.nan, np.nan]}))
+        assert df_new['a'][0] == pytest.approx(3)
+        assert df_new['b'][0] == pytest.approx(20)
+        f.default_value = pd.Series({'a': 3.0, 'b': 20.0})
+        df_new = f.transform(pd.DataFrame({'b': [np.nan, np.nan], 'a': [np.nan, np.nan]}))
+        assert df_new['b'][0] == pytest.approx(20)
+
+    def test_PerColumnImputer(self):
+        df = pd.DataFrame({
+            'a': [0, np.inf, np.nan, 0.1, -np.inf, 15, 0.5, 0.3, 0.5],
+            'b': [5, 6, 7, 5, np.nan, 5, 6, 5, 45],
+        })
+        imputer = PerColumnImputer()
+        imputer.fit(df)
+        df_new = imputer.transform(df[['b', 'a']])
+        assert list(df_new.columns) == ['b', 'a']
+        assert np.all(df_new.index == df.index)
+        assert np.all(np.isfinite(df_new))
+        assert df_new['a'][1] == pytest.approx(imputer.data_max['a'])
+        assert df_new['a'][2] == pytest.approx(imputer.data_median['a'])
+        assert df_new['a'][4] == pytest.approx(imputer.data_min['a'])
+        assert df_new['b'][4] == pytest.approx(imputer.data_median['b'])
+        assert df_new['a'][5] == 15
+
+        assert imputer.data_min['a'] == 0
+        assert imputer.data_max['a'] == 15
+
+        imputer = PerColumnImputer()
+        imputer.partial_fit(df.iloc[:5])
+        imputer.partial_fit(df.iloc[5:])
+        assert imputer.data_min['a'] == 0
+        assert imputer.data_max['a'] == 15
+        assert imputer.data_min['b'] == 5
+        assert imputer.data_max['b'] == 45
+        assert imputer.data_median['b'] == pytest.approx(5, abs=1)
+
+        imputer = PerColumnImputer()
+        imputer.partial_fit(df.iloc[:5])
+        imputer.partial_fit(df.iloc[5:][['b', 'a']].assign(c=1.0))
+        assert list(imputer.data_max.index) == ['a', 'b']
+        assert imputer.data_max['a'] == 15
+        assert imputer.data_max['b'] == 45
+        assert imputer.data_min['b'] == 5
+        imputer.partial_fit(df[['b']])
+        assert imputer.data_max['a'] == 15
+        assert imputer.data_median['a'] == pytest.approx(0.3, abs=0.2)
+
+        imputer = PerColumnImputer().fit(df)
+        mixed = pd.DataFrame({
+            'a': df['a'].astype(np.float32),
+            'b': np.arange(df.shape[0]),
+            'c': ['x'] * df.shape[0],
+        })
+        df_new = imputer.transform(mixed)
+        assert list(df_new.dtypes) == list(mixed.dtypes)
+        assert df_new['a'][1] == pytest.approx(imputer.data_max['a'])
+        assert df_new['a'][2] == pytest.approx(imputer.data_median['a'])
+        pd.testing.assert_series_equal(df_new['b'], mixed['b'])
+        pd.testing.assert_series_equal(df_new['c'], mixed['c'])
+
+        df_new = imputer.transform(df.astype('Float64'))
+        assert (df_new['a'].dtype, df_new['b'].dtype) == ('Float64', 'Float64')
+        assert np.allclose(df_new.to_numpy(dtype=np.float64), imputer.transform(df).to_numpy())
+
+    def test_polars_imputers(self):
+        pl = pytest.importorskip("polars")
+        df = pd.DataFrame({
+            'a': [0, np.nan, np.inf, 0.1, -np.inf, 15, 0.5, 0.3, 0.5],
+            'b': [5, 6, np.nan, 5, 9, 5, 6, 5, 45],
+        })
+        df_pl = pl.from_pandas(df, nan_to_null=False)
+
+        out = NaNtoInf().transform(df_pl)
+        assert isinstance(out, pl.DataFrame)
+        assert np.all(np.isnan(out['a'].to_numpy()) == pd.isnull(NaNtoInf().transform(df)['a']))
+
+        imputer = MeanImputer().fit(NaNtoInf().transform(df))
+        out = imputer.transform(df_pl)
+        assert isinstance(out, pl.DataFrame)
+        assert out['a'][1] == pytest.approx(imputer.mean['a'])
+        assert out['b'][2] == pytest.approx(imputer.mean['b'])
+        assert out['a'][2] == np.inf
+
+        imputer = MedianImputer().fit(NaNtoInf().transform(df))
+        out = imputer.transform(df_pl.with_columns(pl.col('b').fill_nan(None)))
+        assert out['b'][2] == pytest.approx(imputer.median['b'])
+
+        imputer = PerColumnImputer().fit(df)
+        out = imputer.transform(df_pl)
+        assert np.allclose(out.to_numpy(), imputer.transform(df).to_numpy())
+
+        out = ForwardFillImputer().transform(df_pl)
+        assert out['a'][1] == 0
+        assert out['b'][2] == 6
+        out = BackwardFillImputer().transform(df_pl)
+        assert out['b'][2] == 5
+        out = FillImputer(value=-1).transform(df_pl)
+        assert out['a'][1] == -1
+        assert out['b'][2] == -1
+
+    def test_modified_life(self):
+        df = pd.DataFrame({'a': [0, np.nan, 12, 0.9, 15], 'b': [1, 2, 3, 4, 5]})
+        imputer = MeanImputer()
+        imputer.partial_fit(df)
+        df.iloc[1, 0] = 100
+        imputer.partial_fit(df)
+        assert imputer.mean['a'] == pytest.approx(np.mean([0, 12, 0.9, 15] * 2 + [100]))
+
+        df = pd.DataFrame({'a': [0, np.nan, 12, 0.9, 15]})
+        f = RollingMeanImputer(window_size=2)
+        df_new = f.fit_transform(df)
+        assert np.isnan(df['a'][1])
+        assert df_new['a'][1] == pytest.approx(6)
+        df['a'] = [10, np.nan, 20, 0.9, 15]
+        assert f.transform(df)['a'][1] == pytest.approx(15)
@@ -1,6 +1,23 @@
 import numpy as np 
-from ceruleo.results.results import split_lives_indices
+import ceruleo.results.results as results_module
+from ceruleo.results.results import (
+    CVResults,
+    PredictionResult,
+    _lives_for,
+    clear_lives_cache,
+    compute_rul_line,
+    cv_regression_metrics,
+    metric_J,
+    split_lives,
+    split_lives_indices,
+    unexpected_breaks,
+    unexploited_lifetime,
+)
+from ceruleo.results import picewise_regression
+from ceruleo.results.picewise_regression import PiecewiseLinearRegression
 import pytest
+from sklearn.metrics import mean_absolute_error as mae
+from sklearn.metrics import mean_squared_error as mse
 
 class TestResults:
     def test_1(self):
@@ -13,16 +30,173 @@ class TestResults:
         assert (y_true[indices[0]] == v1).all()
         assert (y_true[indices[1]] == v2).all()
         assert (y_true[indices[2]] == v3).all()
-        assert list(map(len, indices)) == [50, 45, 50]
+        assert [len(y_true[s]) for s in indices] == [50, 45, 50]
 
         y_true = v1
         indices = split_lives_indices(y_true)
         assert (y_true[indices[0]] == v1).all()
-        assert list(map(len, indices)) == [50]
+        assert [len(y_true[s]) for s in indices] == [50]
 
         with pytest.raises(AssertionError):
             y_true = np.linspace(25, 0, 1)
             indices = split_lives_indices(y_true)
             assert (y_true[indices[0]] == v1).all()
-            assert list(map(len, indices)) == []
+            assert [len(y_true[s]) for s in indices] == []
 
+
+    def test_lives_cache(self):
+        y_true = np.hstack((np.linspace(25, 0, 50), np.linspace(17, 0, 45)))
+        y_pred = y_true + np.sin(np.arange(len(y_true)))
+        y_pred[y_pred < 0] = 0
+        d = [
+            PredictionResult("fold_1", y_true, y_pred),
+            PredictionResult("fold_2", y_true, y_pred * 1.1),
+        ]
+        windows, mean_ul, std_ul = unexploited_lifetime(d, 10, 5)
+        lives = _lives_for(d)
+        assert len(lives) == 2
+        assert all(len(r) == 2 for r in lives)
+        assert _lives_for(d) is lives
+
+        windows, mean_ub, std_ub = unexpected_breaks(d, 10, 5)
+        assert _lives_for(d) is lives
+        expected = [
+            np.mean([life.unexpected_break(m) for r in lives for life in r])
+            for m in windows
+        ]
+        assert np.allclose(mean_ub, expected)
+        expected = [
+            np.mean([life.unexploited_lifetime(m) for r in lives for life in r])
+            for m in windows
+        ]
+        assert np.allclose(mean_ul, expected)
+
+        d.append(PredictionResult("fold_3", y_true, y_pred * 0.9))
+        new_lives = _lives_for(d)
+        assert len(new_lives) == 3
+        assert new_lives[0] is lives[0] and new_lives[1] is lives[1]
+        windows, mean_ul_3, std_ul_3 = unexploited_lifetime(d, 10, 5)
+        clear_lives_cache()
+        assert _lives_for(d) is not new_lives
+        assert np.allclose(mean_ul_3, unexploited_lifetime(d, 10, 5)[1])
+
+        d[0] = PredictionResult("fold_1", y_true, y_pred * 1.2)
+        assert _lives_for(d)[0] is not new_lives[0]
+
+        other = [PredictionResult("fold_1", y_true, y_pred)]
+        _lives_for(other)
+        assert len(results_module._lives_cache[0]) == 1
+
+    def test_metric_J(self):
+        y_true = np.hstack((np.linspace(25, 0, 50), np.linspace(17, 0, 45)))
+        y_pred = y_true + 3 * np.sin(np.arange(len(y_true)))
+        y_pred[y_pred < 0] = 0
+        d = [
+            PredictionResult("fold_1", y_true, y_pred),
+            PredictionResult("fold_2", y_true, y_pred * 0.8),
+        ]
+        windows, J = metric_J(d, 10, 7, q1=1, q2=0.5)
+        lives = _lives_for(d)
+        for m, J_m in zip(windows, J):
+            J_folds = []
+            for r in lives:
+                ub = np.array([life.unexpected_break(m) for life in r])
+                ul = np.array([life.unexploited_lifetime(m) for life in r])
+                values = (ub / (np.max(ub) + 0.0000000001)) + (
+                    ul / (np.max(ul) + 0.0000000001)
+                ) * 0.5
+                J_folds.append(np.mean(values))
+            assert np.isclose(J_m, np.mean(J_folds))
+
+    def test_compute_rul_line(self):
+        z = compute_rul_line(5, 10)
+        assert np.allclose(z, [5, 4, 3, 2, 1, 0, 0, 0, 0, 0])
+
+        z = compute_rul_line(3.5, 4)
+        assert np.allclose(z, [3.5, 2.5, 1.5, 0.5])
+
+        tt = np.array([-0.5, -1, -2, -3, -4])
+        z = compute_rul_line(4, 6, tt)
+        assert np.allclose(z, [4, 3.5, 2.5, 0.5, 0, 0])
+
+    def test_cv_results(self):
+        y_true = np.array([0, 5, 10, 15, 20, 25, 30])
+        y_pred = np.array([1, 5, 12, 15, 20, 20, 35])
+        cv = CVResults([y_true], [y_pred], bin_edges=np.array([0, 10, 20, 30]))
+        # 10 and 20 lie on an inner edge so they are part of two bins
+        assert np.allclose(cv.mean_error[0], [-1, -2 / 3, 0])
+        assert np.allclose(cv.mae[0], [1, 2 / 3, 10 / 3])
+        assert np.allclose(cv.mse[0], [5 / 3, 4 / 3, 50 / 3])
+        assert [len(e) for e in cv.errors] == [3, 3, 3]
+        assert np.array_equal(cv.errors[1], [-2, 0, 0])
+
+    def test_cv_regression_metrics(self):
+        y_true = np.hstack((np.linspace(100, 0, 80), np.linspace(60, 0, 50)))
+        y_pred = y_true + 5 * np.sin(np.arange(len(y_true)))
+        results = [PredictionResult("fold_1", y_true, y_pred)]
+        out = cv_regression_metrics({"model": results})["model"]
+
+        sw = np.abs(y_true - y_pred) / np.clip(y_true, 0.9, np.inf)
+        assert np.isclose(out["MAE"].n, np.round(mae(y_true, y_pred), 2))
+        assert np.isclose(out["MSE"].n, np.round(mse(y_true, y_pred), 2))
+        assert np.isclose(
+            out["MAE SW"].n, np.round(mae(y_true, y_pred, sample_weight=sw), 2)
+        )
+        assert np.isclose(
+            out["MSE SW"].n, np.round(mse(y_true, y_pred, sample_weight=sw), 2)
+        )
+
+    def test_picewise_linear_regression(self, monkeypatch):
+        t = np.arange(300, dtype=np.float64)
+        y = np.where(t < 150, 300 - t, 150 - 0.5 * (t - 150))
+        y = y + 0.5 * np.sin(t)
+
+        pwlr = PiecewiseLinearRegression()
+        for t_i, y_i in zip(t, y):
+            pwlr.add_point(t_i, y_i)
+        expected = pwlr.finish()
+        for segment in pwlr.segments:
+            if len(segment.segment_error) > 0:
+                assert np.isclose(segment._error_mean, np.mean(segment.segment_error))
+                assert np.isclose(
+                    np.sqrt(segment._error_m2 / len(segment.segment_error)),
+                    np.std(segment.segment_error),
+                )
+
+        line = PiecewiseLinearRegression().fit(t, y).finish()
+        assert len(line.parameters) == len(expected.parameters)
+        assert np.allclose(line.parameters, expected.parameters)
+        assert np.allclose(line.limits, expected.limits)
+
+        class ReferenceSegment(picewise_regression.Segment):
+            def can_add(self, current_t: float, value: float) -> bool:
+                n = self.n + 1
+                y = value - self.initial[1]
+                t = current_t - self.initial[0]
+                xx = self.xx + (((t * t) - self.xx)) / n
+                xy = self.xy + (((t * y) - self.xy)) / n
+                yy = self.yy + (((y * y) - self.yy)) / n
+                B = xy / xx if xx > 0 else 0
+                SSR = (yy - B * xy) * self.n
+                if self.n > 15:
+                    mean_error = np.mean(self.segment_error)
+                    std_error = np.std(self.segment_error)
+                    return not SSR > mean_error + 1.5 * std_error
+                return True
+
+        monkeypatch.setattr(picewise_regression, "Segment", ReferenceSegment)
+        reference = PiecewiseLinearRegression().fit(t, y).finish()
+        assert len(line.parameters) > 1
+        assert len(line.parameters) == len(reference.parameters)
+        assert np.allclose(line.parameters, reference.parameters)
+        assert np.allclose(line.limits, reference.limits)
+
+    def test_split_lives(self):
+        y_true = np.hstack([np.linspace(30 + i, 0, 40) for i in range(20)])
+        y_pred = y_true + np.cos(np.arange(len(y_true)))
+        result = PredictionResult("fold_1", y_true, y_pred)
+
+        lives = split_lives(result)
+        assert len(lives) == 20
+        assert np.allclose(lives[0].y_pred, y_pred[:40])
+        assert np.allclose(lives[2].y_true, y_true[80:120])
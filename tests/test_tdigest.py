@@ -0,0 +1,23 @@
+import pickle
+
+import numpy as np
+from ceruleo.transformation.features.tdigest import Centroid, TDigest
+
+
+class TestTDigest():
+
+    def test_pickle(self):
+        x = np.random.default_rng(0).normal(size=1000)
+        digest = TDigest(20).merge_unsorted(x)
+        restored = pickle.loads(pickle.dumps(digest))
+        assert len(restored.centroids) == len(digest.centroids)
+        assert restored.estimate_quantile(0.5) == digest.estimate_quantile(0.5)
+
+    def test_unpickle_centroid_state(self):
+        # Centroids pickled before __slots__ was added store their __dict__
+        centroid = Centroid.__new__(Centroid)
+        centroid.__setstate__({'mean': 1.5, 'weight': 2.0})
+        assert centroid.mean == 1.5 and centroid.weight == 2.0
+
+        centroid.__setstate__((None, {'mean': 2.5, 'weight': 3.0}))
+        assert centroid.mean == 2.5 and centroid.weight == 3.0
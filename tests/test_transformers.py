@@ -1,5 +1,6 @@
 from typing import List, Optional
 
+import numba
 import numpy as np
 import pandas as pd
 import pytest
@@ -16,6 +17,8 @@ from ceruleo.transformation.features.outliers import (
     ZScoreOutlierRemover)
 from ceruleo.transformation.features.resamplers import \
     IntegerIndexResamplerTransformer
+from ceruleo.transformation.features.rolling_windows import (
+    apply_rolling_data, apply_rolling_data_numba)
 from ceruleo.transformation.features.selection import (ByNameFeatureSelector,
                                                        NullProportionSelector)
 from ceruleo.transformation.features.slicing import SliceRows
@@ -674,6 +677,68 @@ class TestEMD:
         assert r.shape[1] == A.shape[1] * 5
 
 
+class TestRollingWindows:
+    def test_apply_rolling_data(self):
+        values = np.arange(11, dtype=np.float64)
+        out = apply_rolling_data(values, lambda x: np.mean(x), 5, 5)
+        assert out.shape == (3, 1)
+        assert np.allclose(np.squeeze(out), [2, 7, 10])
+
+        out = apply_rolling_data(
+            values, lambda x: np.column_stack((x - x.mean(), x)), 5, 5
+        )
+        assert out.shape == (11, 2)
+        assert np.allclose(out[:, 1], values)
+        assert np.allclose(out[:5, 0], [-2, -1, 0, 1, 2])
+
+        for f in [np.mean, np.std, np.min, np.max, np.sum]:
+            fast = apply_rolling_data(values, f, 4, 3)
+            generic = apply_rolling_data(values, lambda x: f(x), 4, 3)
+            assert fast.shape == generic.shape
+            assert np.allclose(fast, generic)
+        assert np.allclose(
+            apply_rolling_data(values, "max", 5, 5), [[4], [9], [10]]
+        )
+
+        assert np.allclose(
+            apply_rolling_data(values, lambda x: np.sort(x)[x.size // 2], 5, 5), [[2], [7], [10]]
+        )
+        with pytest.raises(ValueError):
+            apply_rolling_data(values, lambda x: x.sort(), 5, 5)
+
+        short = np.arange(3, dtype=np.float64)
+        for step in [1, 10]:
+            out = apply_rolling_data(short, lambda x: np.column_stack((x, 2 * x)), 10, step)
+            assert out.shape == (3, 2)
+            assert np.allclose(out[:, 1], 2 * short)
+            assert np.allclose(apply_rolling_data(short, np.mean, 10, step), [[1]])
+            assert np.allclose(apply_rolling_data(short, lambda x: np.mean(x), 10, step), [[1]])
+
+    def test_apply_rolling_data_numba(self):
+        @numba.njit
+        def peak_to_peak(x):
+            return x.max() - x.min()
+
+        @numba.njit
+        def extremes(x):
+            return np.array([x.min(), x.max()])
+
+        values = np.random.randn(103)
+        out = apply_rolling_data_numba(values, peak_to_peak, 10, 10)
+        expected = apply_rolling_data(values, lambda x: np.ptp(x), 10, 10)
+        assert out.shape == expected.shape
+        assert np.allclose(out, expected)
+
+        out = apply_rolling_data_numba(values[:5], peak_to_peak, 10)
+        assert np.allclose(out, [[np.ptp(values[:5])]])
+
+        out = apply_rolling_data_numba(values, extremes, 7, 3)
+        expected = np.vstack(
+            [[values[i:i + 7].min(), values[i:i + 7].max()] for i in range(0, 97, 3)]
+        )
+        assert np.allclose(out[: expected.shape[0]], expected)
+
+
 class TestResamplers:
     def test_resampler(self):
 